@@ -0,0 +1,158 @@
+import asyncio
+import functools
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+from similarity import _candidates, _cartesian_frame, _check_result, \
+    _format_pairs, _pairs_frame, _prepare, _score_pairs, _spatial_index
+
+async def asimilarity(
+            df1,
+            df2,
+            how='sindex',
+            keep_geom='geometry_x',
+            drop_zeroes=False,
+            result='frame',
+            max_distance=None,
+            batch_size=1000,
+            progress=None,
+            candidate_progress=None,
+            executor=None,
+            **kwargs
+        ):
+    """
+    Computes similarity between geometries of two GeoDataFrames without
+    blocking the event loop.
+
+    The input is prepared, the candidate pairs are found for batches of
+    batch_size rows of df1 and scored in batches of batch_size pairs, and
+    the result is built, all in an executor, and control is returned to
+    the event loop between batches. Cancelling the awaiting task stops once
+    the running batch finishes.
+
+    Parameters
+    ----------
+    df1 : GeoDataFrame
+    df2 : GeoDataFrame
+    how : string
+        Either 'sindex' or 'cartesian'
+        Passed as input to the similarity method
+    keep_geom : string
+        Either 'geometry_x' or 'geometry_y', indicating which geometry column
+        (from df1 and df2 respectively) to use in the returned GeoDataFrame
+    drop_zeroes : bool
+        If True, the rows in the returned GeoDataFrame with a similarity
+        score of 0 will be dropped.
+    result : string
+        Either 'frame', 'pairs' or 'sparse'
+        Passed as input to the similarity method
+    max_distance : float or None
+        Passed as input to the similarity method
+    batch_size : int
+        Number of rows of df1 to find the candidate pairs of, and number of
+        pairs to score, in the executor at a time
+    progress : callable or None
+        Called as progress(pairs_done, total_pairs) once the candidate pairs
+        are found and after every batch of pairs.
+    candidate_progress : callable or None
+        Called as candidate_progress(rows_done, total_rows) after every
+        batch of rows of df1 (after MultiLineStrings are flattened) the
+        candidate pairs were found for.
+    executor : concurrent.futures.Executor or None
+        Executor to score the batches in. If None, a single thread is
+        started for this call and shut down when it returns or is cancelled.
+    kwargs : keyword arguments that will be passed to compare()
+
+    Returns
+    -------
+    df : GeoDataFrame, DataFrame or scipy.sparse.csr_matrix
+        Same as similarity(). With result='frame', the similarity_score
+        column is a float column, and with how='sindex' the rows are sorted
+        by the positions of the pairs in df1 and df2 instead of in the
+        order the spatial index returned them.
+    """
+
+    if batch_size < 1:
+        raise ValueError(
+            "`batch_size` must be at least 1 but was '{}'".format(batch_size)
+        )
+
+    _check_result(result)
+
+    # Pairs within max_distance may not have intersecting bounding boxes,
+    # so the box they are clipped to is grown by max_distance
+    if max_distance is not None:
+        kwargs.setdefault('clip_margin', max_distance)
+
+    # Keep the original indices to report pairs with
+    index1 = df1.index
+    index2 = df2.index
+
+    loop = asyncio.get_running_loop()
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    try:
+        df1, df2, orig1, orig2 = await loop.run_in_executor(
+            executor, _prepare, df1, df2)
+
+        # Built once instead of for every batch of rows
+        spatial_index = None
+        if how == 'sindex' or max_distance is not None:
+            spatial_index = await loop.run_in_executor(
+                executor, _spatial_index, df2)
+
+        pos1 = []
+        pos2 = []
+        for start in range(0, len(df1), batch_size):
+            stop = min(start + batch_size, len(df1))
+            batch1, batch2 = await loop.run_in_executor(
+                executor, _candidates, df1.iloc[start:stop], df2, how,
+                max_distance, spatial_index)
+            pos1.append(batch1 + start)
+            pos2.append(batch2)
+            if candidate_progress is not None:
+                candidate_progress(stop, len(df1))
+        pos1 = np.concatenate(pos1)
+        pos2 = np.concatenate(pos2)
+
+        total = len(pos1)
+        if progress is not None:
+            progress(0, total)
+
+        scores = np.empty(total, dtype=float)
+        for start in range(0, total, batch_size):
+            stop = min(start + batch_size, total)
+            scores[start:stop] = await loop.run_in_executor(
+                executor,
+                functools.partial(_score_pairs, df1, df2, pos1[start:stop],
+                                  pos2[start:stop], **kwargs))
+            if progress is not None:
+                progress(stop, total)
+
+        if result != 'frame':
+            return await loop.run_in_executor(
+                executor, _format_pairs, result, pos1, pos2, scores, index1,
+                index2, orig1, orig2, drop_zeroes)
+
+        # Same columns as similarity(), which only builds the frame of the
+        # Cartesian product differently
+        if how == 'cartesian' and max_distance is None:
+            build_frame = _cartesian_frame
+        else:
+            build_frame = _pairs_frame
+        res = await loop.run_in_executor(
+            executor, build_frame, df1, df2, pos1, pos2, scores, keep_geom)
+    finally:
+        if own_executor:
+            # Do not wait on a cancelled batch, and drop any queued one
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    if drop_zeroes == True:
+        # Drop rows of resulting GeoDataFrame that have
+        # a similarity_score of 0
+        res = res[res['similarity_score'] != 0]
+
+    return res
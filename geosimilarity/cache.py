@@ -0,0 +1,170 @@
+import glob
+import hashlib
+import json
+import os
+import re
+
+import geopandas as gpd
+
+# Bump to invalidate results cached by older versions
+CACHE_VERSION = 2
+
+# Name of the files written by save_result, so that evict never removes
+# other files in the cache directory
+CACHE_FILE_PATTERN = re.compile(r'^[0-9a-f]{64}\.parquet$')
+
+# Files that make up a single shapefile
+SHAPEFILE_EXTENSIONS = ['.shp', '.shx', '.dbf', '.prj', '.cpg']
+
+def check_pyarrow():
+    """
+    Raises an ImportError if pyarrow, which results are cached with, is not
+    installed, so that it is reported before a result is computed.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required to cache results in `cache_dir`"
+        )
+
+def file_hash(filepath):
+    """
+    Computes the SHA-256 hash of the content of a file readable by
+    geopandas.read_file. For a shapefile, the *.shx, *.dbf, *.prj and *.cpg
+    files next to it are hashed too, and for a directory every file in it.
+
+    Parameters
+    ----------
+    filepath : string
+
+    Returns
+    -------
+    digest : string
+        Hexadecimal SHA-256 digest
+    """
+    if os.path.isdir(filepath):
+        paths = sorted(p for p in glob.glob(os.path.join(filepath, '*'))
+                       if os.path.isfile(p))
+    elif os.path.splitext(filepath)[1].lower() == '.shp':
+        stem = os.path.splitext(filepath)[0]
+        paths = [stem + ext for ext in SHAPEFILE_EXTENSIONS
+                 if os.path.isfile(stem + ext)]
+    else:
+        paths = [filepath]
+
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+def cache_key(filepath1, filepath2, **params):
+    """
+    Computes the cache key of the similarity result of two files.
+
+    Parameters
+    ----------
+    filepath1 : string
+        Filepath of first GeoDataFrame
+    filepath2 : string
+        Filepath of second GeoDataFrame
+    params : keyword arguments that change the result of similarity
+        (e.g. how, method, clip, clip_max, precision)
+
+    Returns
+    -------
+    key : string
+        Hexadecimal SHA-256 digest of the content of both files and params
+    """
+    key = {
+        'version': CACHE_VERSION,
+        'file1': file_hash(filepath1),
+        'file2': file_hash(filepath2),
+        'params': params,
+    }
+    return hashlib.sha256(
+        json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+def load_result(cache_dir, key, keep_geom='geometry_x'):
+    """
+    Loads a cached similarity result.
+
+    Parameters
+    ----------
+    cache_dir : string
+        Directory of the cache
+    key : string
+        Result of cache_key
+    keep_geom : string
+        Either 'geometry_x' or 'geometry_y', indicating which geometry column
+        to set as the geometry of the returned GeoDataFrame
+
+    Returns
+    -------
+    result : GeoDataFrame or None
+        The cached result, or None if it is not in the cache
+    """
+    path = os.path.join(cache_dir, key + '.parquet')
+    if not os.path.exists(path):
+        return None
+
+    result = gpd.read_parquet(path)
+
+    # Mark as recently used for eviction
+    os.utime(path)
+
+    if keep_geom in result.columns:
+        result = result.set_geometry(keep_geom)
+    return result
+
+def save_result(cache_dir, key, result, max_size=None):
+    """
+    Saves a similarity result to the cache, then evicts the least recently
+    used results until the cache is at most max_size bytes.
+
+    Parameters
+    ----------
+    cache_dir : string
+        Directory of the cache. Created if it does not exist.
+    key : string
+        Result of cache_key
+    result : GeoDataFrame
+        Result of similarity
+    max_size : int or None
+        Maximum size of the cache in bytes. If None, nothing is evicted.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Parquet requires every geometry column to be a GeoSeries
+    result = result.copy()
+    for col in ['geometry_x', 'geometry_y']:
+        if col in result.columns:
+            result[col] = gpd.GeoSeries(result[col])
+
+    path = os.path.join(cache_dir, key + '.parquet')
+    result.to_parquet(path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+    if max_size is not None:
+        evict(cache_dir, max_size)
+
+def evict(cache_dir, max_size):
+    """
+    Removes the least recently used results of the cache until it is at
+    most max_size bytes. Only files written by save_result are counted and
+    removed.
+    """
+    paths = sorted((os.path.join(cache_dir, name)
+                    for name in os.listdir(cache_dir)
+                    if CACHE_FILE_PATTERN.match(name)),
+                   key=os.path.getmtime)
+    size = sum(os.path.getsize(p) for p in paths)
+
+    for path in paths:
+        if size <= max_size:
+            break
+        size -= os.path.getsize(path)
+        os.remove(path)
@@ -0,0 +1,375 @@
+import math
+import numpy as np
+import pandas as pd
+import similaritymeasures as sm
+
+from linestring_tools import line_to_coords
+from rtree import index as rtree_index
+
+class CompactLines:
+    """
+    Compact storage of the coordinates of many (Multi)LineStrings.
+
+    The coordinates of every line are stored as offsets from the origin of
+    the tile (a tile_size square grid cell) containing its first point,
+    either as float32 or as int32 multiples of `resolution`. Together with
+    the bounds and length of each line, this takes 8 bytes per point and
+    about 70 bytes per line, instead of a shapely object and Python lists of
+    coordinates. The Frechet distance, clipping and spatial index stages
+    work directly on these arrays (see compare_coords and
+    compact_similarity).
+
+    MultiLineStrings are stored as one line per LineString they contain,
+    like in similarity().
+
+    Maximum error
+    -------------
+    Every decoded coordinate is within `max_error` of the original one,
+    which is measured when the lines are stored and is at most:
+        - 'int32': resolution / 2
+        - 'float32': (tile_size + largest extent of a line) * 2**-24
+    A coordinate error of e changes the Frechet distance by at most 2*e,
+    so a similarity_score changes by about 2*e/length of line1 at most.
+    With the default tile_size and resolution, 'int32' keeps this far below
+    10**-precision for any line longer than a millionth of the largest
+    extent of a line; 'float32' is about 100 times coarser.
+
+    Parameters
+    ----------
+    geoms : GeoSeries or GeoDataFrame
+        (Multi)LineStrings to store
+    dtype : string
+        Either 'int32' (fixed-point) or 'float32'
+    resolution : float or None
+        Step of the fixed-point coordinates for 'int32', in the units of
+        the CRS. If None, the smallest step at which every offset fits in
+        an int32.
+    tile_size : float or None
+        Size of the tiles whose origin coordinates are stored relative to,
+        in the units of the CRS. If None, the largest width or height of
+        any line.
+    """
+
+    allowed_dtypes = [
+        'float32',
+        'int32',
+    ]
+
+    def __init__(self, geoms, dtype='int32', resolution=None, tile_size=None):
+        if dtype not in self.allowed_dtypes:
+            raise ValueError(
+                "`dtype` was '{0}' but is expected to be in {1}"
+                .format(dtype, self.allowed_dtypes)
+            )
+
+        self.dtype = dtype
+        self.index = geoms.index
+
+        # One line per LineString, with the position of the original
+        # (Multi)LineString it belongs to
+        lines = []
+        parent = []
+        for pos, geom in enumerate(geoms.geometry.values):
+            parts = geom.geoms if geom.geom_type == 'MultiLineString' \
+                else [geom]
+            for part in parts:
+                lines.append(np.array(line_to_coords(part), dtype=float))
+                parent.append(pos)
+
+        if len(lines) == 0:
+            raise ValueError(
+                "GeoSeries was Null"
+            )
+
+        self.parent = np.array(parent, dtype=np.int64)
+        self.parts = pd.Series(self.parent).groupby(self.parent) \
+            .cumcount().to_numpy()
+        self.offsets = np.cumsum([0] + [len(c) for c in lines]) \
+            .astype(np.int64)
+        coords = np.concatenate(lines)[:, :2]
+
+        # Largest width or height of a line
+        extent = max(
+            (np.maximum.reduceat(coords, self.offsets[:-1])
+             - np.minimum.reduceat(coords, self.offsets[:-1])).max(), 0)
+
+        if tile_size is None:
+            tile_size = extent if extent > 0 else 1.0
+        # Every offset is at most tile_size + extent
+        if resolution is None:
+            resolution = (tile_size + extent) / (np.iinfo(np.int32).max - 1)
+        self.tile_size = tile_size
+        self.resolution = resolution
+
+        # Origin of the tile of the first point of each line
+        firsts = coords[self.offsets[:-1]]
+        tile_origins = np.floor(firsts / tile_size) * tile_size
+        self.origins, tile = np.unique(tile_origins, axis=0,
+                                       return_inverse=True)
+        self.tile = tile.reshape(-1).astype(np.int32)
+        origin = np.repeat(self.origins[self.tile], np.diff(self.offsets),
+                           axis=0)
+
+        if dtype == 'int32':
+            steps = np.rint((coords - origin) / resolution)
+            if np.abs(steps).max() > np.iinfo(np.int32).max:
+                raise ValueError(
+                    "Coordinates do not fit in int32 with `resolution` '{0}' \
+                    and `tile_size` '{1}'".format(resolution, tile_size)
+                )
+            self.coords = steps.astype(np.int32)
+        else:
+            self.coords = (coords - origin).astype(np.float32)
+
+        decoded = self._decode(slice(None), origin)
+        self.max_error = float(np.abs(decoded - coords).max())
+
+        # Bounds and length are only stored once per line, so they are kept
+        # exact: the spatial index finds the same pairs as similarity()
+        self.bounds = np.column_stack([
+            np.minimum.reduceat(coords[:, 0], self.offsets[:-1]),
+            np.minimum.reduceat(coords[:, 1], self.offsets[:-1]),
+            np.maximum.reduceat(coords[:, 0], self.offsets[:-1]),
+            np.maximum.reduceat(coords[:, 1], self.offsets[:-1]),
+        ])
+        self.length = np.array([_length(coords[a:b]) for a, b
+                                in zip(self.offsets[:-1], self.offsets[1:])])
+
+        self._sindex = None
+
+    def _decode(self, rows, origin):
+        """
+        Converts stored coordinates back to float64 coordinates.
+        """
+        if self.dtype == 'int32':
+            return origin + self.coords[rows] * self.resolution
+        return origin + self.coords[rows].astype(float)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        """
+        Number of bytes used by the arrays of the stored lines.
+        """
+        return sum(a.nbytes for a in [self.coords, self.offsets, self.tile,
+                                      self.origins, self.parent, self.parts,
+                                      self.bounds, self.length])
+
+    @property
+    def sindex(self):
+        """
+        R-tree spatial index of the bounds of the stored lines.
+        """
+        if self._sindex is None:
+            self._sindex = rtree_index.Index(
+                (i, tuple(b), None) for i, b in enumerate(self.bounds))
+        return self._sindex
+
+    def line_coords(self, i):
+        """
+        Returns the float64 coordinates of the i-th stored line as an array
+        of shape (number of points, 2).
+        """
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return self._decode(rows, self.origins[self.tile[i]])
+
+def _length(coords):
+    """
+    Length of the line through coords.
+    """
+    return float(np.hypot(*np.diff(coords, axis=0).T).sum())
+
+def clip_coords(coords, left, bottom, right, top):
+    """
+    Clips the line through coords to the rectangle (left, bottom, right,
+    top), with the Liang-Barsky algorithm applied to every segment at once.
+
+    Parameters
+    ----------
+    coords : ndarray
+        Coordinates of the line, of shape (number of points, 2)
+    left, bottom, right, top : float
+        Bounds of the rectangle
+
+    Returns
+    -------
+    clipped : ndarray
+        Coordinates of the parts of the line inside the rectangle, in order
+        and concatenated like line_to_coords does for a MultiLineString
+    length : float
+        Length of the parts of the line inside the rectangle
+    """
+    p0 = coords[:-1]
+    d = coords[1:] - p0
+
+    t0 = np.zeros(len(d))
+    t1 = np.ones(len(d))
+    visible = np.ones(len(d), dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in [(-d[:, 0], p0[:, 0] - left), (d[:, 0], right - p0[:, 0]),
+                     (-d[:, 1], p0[:, 1] - bottom), (d[:, 1], top - p0[:, 1])]:
+            parallel = p == 0
+            visible &= ~(parallel & (q < 0))
+            r = q / p
+            t0 = np.where(p < 0, np.maximum(t0, r), t0)
+            t1 = np.where(p > 0, np.minimum(t1, r), t1)
+
+    # Drop segments that only touch the rectangle or have no length
+    visible &= (t0 < t1) & np.any(d != 0, axis=1)
+
+    vis = np.flatnonzero(visible)
+    if len(vis) == 0:
+        return np.empty((0, 2)), 0.0
+
+    starts = p0[vis] + t0[vis, None] * d[vis]
+    ends = p0[vis] + t1[vis, None] * d[vis]
+
+    # A segment continues the previous part if it starts where the
+    # previous visible segment ends
+    new_part = np.ones(len(vis), dtype=bool)
+    new_part[1:] = ~((vis[1:] == vis[:-1] + 1) & (t1[vis[:-1]] == 1)
+                     & (t0[vis[1:]] == 0))
+
+    # Each segment adds its end point, and its start point if it starts
+    # a new part
+    end_pos = np.cumsum(1 + new_part) - 1
+    clipped = np.empty((end_pos[-1] + 1, 2))
+    clipped[end_pos] = ends
+    clipped[end_pos[new_part] - 1] = starts[new_part]
+
+    length = float(np.hypot(*(ends - starts).T).sum())
+
+    return clipped, length
+
+def compare_coords(
+        coords1,
+        coords2,
+        method='frechet_dist',
+        precision=6,
+        clip=True,
+        clip_max=0.5,
+        clip_margin=0.0,
+        length1=None,
+        length2=None
+    ):
+    """
+    Same as compare, on arrays of coordinates instead of LineStrings.
+
+    Parameters
+    ----------
+    coords1 : ndarray
+        Coordinates of line1, of shape (number of points, 2)
+    coords2 : ndarray
+        Coordinates of line2, of shape (number of points, 2)
+    method, precision, clip, clip_max, clip_margin :
+        Passed as input to the compare method
+    length1 : float or None
+        Length of line1, computed from coords1 if None
+    length2 : float or None
+        Length of line2, computed from coords2 if None
+
+    Returns
+    -------
+    similarity_score : float
+        Returns value 0.0 (completely dissimilar) to
+        1.0 (completely similar)
+    """
+
+    allowed_methods = [
+        'frechet_dist',
+    ]
+
+    if method not in allowed_methods:
+        raise ValueError(
+            "`method` must be in '{0}''".format(allowed_methods)
+        )
+
+    if length1 is None:
+        length1 = _length(coords1)
+    if length2 is None:
+        length2 = _length(coords2)
+
+    if (clip == True):
+        # Intersection of the bounding boxes of line1 and line2
+        left = max(coords1[:, 0].min(), coords2[:, 0].min()) - clip_margin
+        bottom = max(coords1[:, 1].min(), coords2[:, 1].min()) - clip_margin
+        right = min(coords1[:, 0].max(), coords2[:, 0].max()) + clip_margin
+        top = min(coords1[:, 1].max(), coords2[:, 1].max()) + clip_margin
+
+        # No intersecting bounding box
+        if (left > right or bottom > top):
+            return 0
+
+        clipped1, clipped_length1 = clip_coords(coords1, left, bottom,
+                                                right, top)
+        clipped2, clipped_length2 = clip_coords(coords2, left, bottom,
+                                                right, top)
+
+        # Line does not intersect minimum bounding box
+        if (len(clipped1) == 0 or len(clipped2) == 0):
+            return 0
+
+        # In this case, the resulting clipped lines do not accurately
+        # represent the similarity between the original lines
+        if (clipped_length1 < length1*clip_max
+                or clipped_length2 < length2*clip_max):
+            return 0
+
+        coords1 = clipped1
+        coords2 = clipped2
+
+    # Formula: e^(-frechet_dist/line1.length)
+    return round(math.exp((-1)*sm.frechet_dist(coords1, coords2)
+                          /length1), precision)
+
+def compact_similarity(lines1, lines2, drop_zeroes=False, **kwargs):
+    """
+    Computes the similarity_score of every pair of lines of lines1 and
+    lines2 whose bounding boxes intersect, without converting them back to
+    shapely objects.
+
+    Parameters
+    ----------
+    lines1 : CompactLines
+    lines2 : CompactLines
+    drop_zeroes : bool
+        If True, the pairs with a similarity score of 0 will be dropped.
+    kwargs : keyword arguments that will be passed to compare_coords()
+
+    Returns
+    -------
+    res : DataFrame
+        Same as similarity(..., result='pairs'): the columns 'idx1', 'idx2'
+        (the indices of the GeoSeries lines1 and lines2 were created from),
+        'part1', 'part2' and 'similarity_score'
+    """
+    pos1 = []
+    pos2 = []
+    scores = []
+    for i in range(len(lines1)):
+        coords1 = lines1.line_coords(i)
+        for j in sorted(lines2.sindex.intersection(tuple(lines1.bounds[i]))):
+            pos1.append(i)
+            pos2.append(j)
+            scores.append(compare_coords(coords1, lines2.line_coords(j),
+                                         length1=lines1.length[i],
+                                         length2=lines2.length[j], **kwargs))
+
+    pos1 = np.array(pos1, dtype=np.int64)
+    pos2 = np.array(pos2, dtype=np.int64)
+    scores = np.array(scores, dtype=float)
+
+    if drop_zeroes == True:
+        nonzero = scores != 0
+        pos1, pos2, scores = pos1[nonzero], pos2[nonzero], scores[nonzero]
+
+    return pd.DataFrame({
+        'idx1': lines1.index[lines1.parent[pos1]],
+        'idx2': lines2.index[lines2.parent[pos2]],
+        'part1': lines1.parts[pos1],
+        'part2': lines2.parts[pos2],
+        'similarity_score': scores,
+    })
@@ -10,7 +10,8 @@ def compare(
         method='frechet_dist',
         precision=6,
         clip=True,
-        clip_max=0.5
+        clip_max=0.5,
+        clip_margin=0.0
     ):
 
     """
@@ -36,6 +37,11 @@ def compare(
         The maximum portion of the line that can be clipped before returning
         a similarity score of 0.
         Default is 0.5 ("At least one half of the line must be compared.")
+    clip_margin : float
+        Distance to grow the minimum bounding box by on every side before
+        clipping, so that lines at most clip_margin apart whose bounding
+        boxes do not intersect (e.g. parallel lines) are still compared.
+        Default is 0.0.
 
     Returns
     -------
@@ -65,12 +71,12 @@ def compare(
         box2_top = box2[3]
 
         # Gives bottom-left point of intersection rectangle
-        left = max(box1_left, box2_left)
-        bottom = max(box1_bottom, box2_bottom)
+        left = max(box1_left, box2_left) - clip_margin
+        bottom = max(box1_bottom, box2_bottom) - clip_margin
 
         # Gives top-right point of intersection rectangle
-        right = min(box1_right, box2_right)
-        top = min(box1_top, box2_top)
+        right = min(box1_right, box2_right) + clip_margin
+        top = min(box1_top, box2_top) + clip_margin
 
         # No intersecting bounding box
         if (left > right or bottom > top) :
@@ -4,11 +4,16 @@ Main file to run Geosimilarity CLI.
 import click
 import geopandas as gpd
 
+from cache import cache_key as _cache_key
+from cache import check_pyarrow as _check_pyarrow
+from cache import load_result as _load_result
+from cache import save_result as _save_result
 from compare import compare as _compare
 from linestring_tools import line_to_coords as _line_to_coords
 from linestring_tools \
     import flatten_multilinestring_df as _flatten_multilinestring_df
 from similarity import similarity as _similarity
+from tiling import tiled_similarity as _tiled_similarity
 from tabulate import tabulate
 from shapely import wkt
 
@@ -187,6 +192,10 @@ geometry column, respectively.', \
 type=click.Choice(['geometry_x', 'geometry_y']))
 @click.option('--max_rows', default=None, help='Max rows of result \
 GeoDataFrame to print.', type=int)
+@click.option('--max_distance', default=None, help='If given, only pairs of \
+geometries at most this distance apart (in the units of the CRS) are compared, \
+instead of every pair whose bounding boxes intersect.', \
+type=click.FloatRange(min=0))
 @click.option('--method', default='frechet_dist', help='Which similarity \
 measure to use calculate similarity_score. Currently supports \'frechet_dist\''\
 , type=click.Choice(['frechet_dist']))
@@ -200,6 +209,12 @@ type=bool)
 @click.option('--clip_max', default=0.5, help='The minimum ratio of length of \
 the clipped geometry to the length of the original geometry, at which to return\
  a non-zero similarity_score.', type=click.FloatRange(min=0, max=1))
+@click.option('--cache_dir', default=None, help='Directory to cache results \
+in. If given, rerunning with the same files and options loads the result from \
+the cache instead of recomputing it.', type=click.Path())
+@click.option('--cache_max_size', default=1024, help='Maximum size of the \
+cache in MB. The least recently used results are removed first. Default=1024.'\
+, type=click.FloatRange(min=0))
 def similarity(
             filepath1,
             filepath2,
@@ -208,6 +223,8 @@ def similarity(
             how='sindex',
             keep_geom='geometry_x',
             max_rows=None,
+            cache_dir=None,
+            cache_max_size=1024,
             **kwargs,
         ):
     """
@@ -234,24 +251,50 @@ def similarity(
         Either 'geometry_x' or 'geometry_y', indicating which geometry column
         (from df1 and df2 respectively) to use in the returned GeoDataFrame
         Passed as input to the similarity method
+    cache_dir : string or None
+        Directory to cache results in, keyed by the content of both files
+        and the options that change the result. If None, nothing is cached.
+    cache_max_size : float
+        Maximum size of the cache in MB
 
     Output
     -------
     Prints result GeoDataFrame as well as file save success/failure messages
     """
 
-    # Read GeoDataFrames
-    df1 = gpd.read_file(filepath1)
-    df2 = gpd.read_file(filepath2)
-
     # keep_geom must be set to the geometry column that is not dropped
     if 'geometry_x' in list(drop_col):
         keep_geom = 'geometry_y'
     if 'geometry_y' in list(drop_col):
         keep_geom = 'geometry_x'
 
-    # Call similarity function
-    result = _similarity(df1, df2, how, keep_geom, **kwargs)
+    result = None
+    if cache_dir:
+        # Fail before computing a result that could not be cached
+        _check_pyarrow()
+        key = _cache_key(filepath1, filepath2, how=how, **kwargs)
+        result = _load_result(cache_dir, key, keep_geom)
+        if result is not None:
+            print('Result loaded from cache {}'.format(cache_dir))
+
+    if result is None:
+        # Read GeoDataFrames
+        df1 = gpd.read_file(filepath1)
+        df2 = gpd.read_file(filepath2)
+
+        # Call similarity function
+        result = _similarity(df1, df2, how, keep_geom, **kwargs)
+
+        # similarity_score is an object column whose type the cache does
+        # not preserve, so it is cast to float for a cached result to give
+        # the same output
+        if 'similarity_score' in result.columns:
+            result['similarity_score'] = \
+                result['similarity_score'].astype(float)
+
+        if cache_dir:
+            _save_result(cache_dir, key, result,
+                         max_size=int(cache_max_size*1024*1024))
 
     # Drop columns if drop_col provided from user
     if len(list(drop_col)) > 0:
@@ -291,11 +334,79 @@ def similarity(
         print('Result saved to {}'.format(rf))
     print('\n')
 
+
+@click.command()
+@click.argument('filepath1', type=click.Path(exists=True))
+@click.argument('filepath2', type=click.Path(exists=True))
+@click.argument('out_dir', type=click.Path())
+@click.option('--tile_size', required=True, help='Width and height of each \
+tile, in the units of the files\' CRS.', \
+type=click.FloatRange(min=0, min_open=True))
+@click.option('--drop_zeroes', default=False, help='If True, rows in the result\
+ GeoDataFrame with a similarity_score of 0 will be dropped.', type=bool)
+@click.option('--keep_geom', default='geometry_x', help='\'left\' and \'right\'\
+ to set geometry column in result GeoDataFrame to df1\'s and df2\'s original \
+geometry column, respectively.', \
+type=click.Choice(['geometry_x', 'geometry_y']))
+@click.option('--max_distance', default=None, help='If given, only pairs of \
+geometries at most this distance apart (in the units of the CRS) are compared, \
+instead of every pair whose bounding boxes intersect.', \
+type=click.FloatRange(min=0))
+@click.option('--method', default='frechet_dist', help='Which similarity \
+measure to use calculate similarity_score. Currently supports \'frechet_dist\''\
+, type=click.Choice(['frechet_dist']))
+@click.option('--precision', default=6, help='Decimal precision to round \
+similarity_score. Default=6.', type=int)
+@click.option('--clip', default=True, help='If True, the similarity_score will \
+be calculated based on the clipped portion of the original geometries within \
+the intersection of each geometry\'s bounding box. If False, the \
+similarity_score will compare the entirety of the original geometries.', \
+type=bool)
+@click.option('--clip_max', default=0.5, help='The minimum ratio of length of \
+the clipped geometry to the length of the original geometry, at which to return\
+ a non-zero similarity_score.', type=click.FloatRange(min=0, max=1))
+def tiled_similarity(
+            filepath1,
+            filepath2,
+            out_dir,
+            tile_size,
+            **kwargs,
+        ):
+    """
+    Calls geosimilarity/tiling.py using input from the CLI
+
+    Parameters
+    ----------
+    filepath1 : string
+        Filepath of first layer
+    filepath2 : string
+        Filepath of second layer
+    out_dir : string
+        Directory to write tile results and the manifest to. Rerunning with
+        the same out_dir skips the tiles that were already completed.
+    tile_size : float
+        Width and height of each tile
+        Passed as input to the tiled_similarity method
+
+    Output
+    -------
+    Prints the filepaths of the tile results
+    """
+    paths = _tiled_similarity(filepath1, filepath2, out_dir, tile_size,
+                              **kwargs)
+
+    print('\n')
+    print('{0} tile results saved to {1}'.format(len(paths), out_dir))
+    for path in paths:
+        print(path)
+    print('\n')
+
 run.add_command(compare)
 run.add_command(flatten_multilinestring_df)
 run.add_command(line_to_coords)
 run.add_command(print_gdf)
 run.add_command(similarity)
+run.add_command(tiled_similarity)
 
 if __name__ == '__main__':
     run()
@@ -0,0 +1,154 @@
+import math
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from linestring_tools import line_to_coords
+
+def _frechet_row(row, c):
+    """
+    Computes the next row of a discrete Frechet table from the previous row
+    (None for the first row) and the distances c between the next point of
+    the first line and every point of the second line. The last entry of
+    the last row is the discrete Frechet distance of the two lines.
+    """
+    new_row = np.empty(len(c))
+    if row is None:
+        new_row[0] = c[0]
+        for j in range(1, len(c)):
+            new_row[j] = max(new_row[j-1], c[j])
+    else:
+        new_row[0] = max(row[0], c[0])
+        for j in range(1, len(c)):
+            new_row[j] = max(min(row[j], new_row[j-1], row[j-1]), c[j])
+    return new_row
+
+class FrechetMatcher:
+    """
+    Incrementally matches a growing trace (e.g. a live GPS trace) against
+    a set of streets.
+
+    For each candidate street, only the last row of the discrete Frechet
+    distance table between the trace and the street is kept, so appending
+    a point to the trace costs O(m) per candidate street of m points
+    instead of recomputing the whole O(nm) table.
+
+    Candidates are the streets whose bounding box is within `radius` of
+    the last point of the trace, found with the spatial index of the
+    streets. A street that becomes a candidate is compared against the
+    whole trace once; a street that stops being a candidate is dropped.
+
+    The scores are equal to compare(trace, street, clip=False) at every
+    step. Clipping is not supported, since the clipped portion of every
+    street depends on the bounding box of the whole trace.
+
+    Parameters
+    ----------
+    streets : GeoDataFrame or GeoSeries
+        (Multi)LineStrings to match the trace against
+    radius : float
+        Distance around the last point of the trace in which streets are
+        candidates
+    precision : int
+        The decimal precision at with to round the similarity score
+        Default decimal precision is 6.
+    """
+
+    def __init__(self, streets, radius=0.0, precision=6):
+        self.radius = radius
+        self.precision = precision
+
+        self._index = streets.index
+        self._coords = [np.array(line_to_coords(line), dtype=float)
+                        for line in streets.geometry.values]
+        self._sindex = gpd.GeoSeries(streets.geometry.values).sindex
+
+        self._trace = []
+        self._length = 0.0
+        # Last row of the Frechet table of each candidate, by position
+        self._rows = {}
+
+    @staticmethod
+    def _next_row(row, point, coords):
+        """
+        Computes the next row of the discrete Frechet table between the trace
+        and a street from the previous row (None for the first point).
+        """
+        c = np.hypot(coords[:, 0] - point[0], coords[:, 1] - point[1])
+        return _frechet_row(row, c)
+
+    def append(self, point):
+        """
+        Appends a point to the trace and updates the candidates.
+
+        Parameters
+        ----------
+        point : tuple
+            (x, y) coordinates of the new point
+        """
+        point = [float(point[0]), float(point[1])]
+
+        # Same summation as LineString.length
+        if self._trace:
+            dx = point[0] - self._trace[-1][0]
+            dy = point[1] - self._trace[-1][1]
+            self._length += math.sqrt(dx*dx + dy*dy)
+        self._trace.append(point)
+
+        x, y = point
+        nearby = set(self._sindex.intersection(
+            (x - self.radius, y - self.radius,
+             x + self.radius, y + self.radius)))
+
+        # Drop streets the trace moved away from
+        for pos in list(self._rows):
+            if pos not in nearby:
+                del self._rows[pos]
+
+        for pos in nearby:
+            coords = self._coords[pos]
+            if pos in self._rows:
+                self._rows[pos] = self._next_row(self._rows[pos], point,
+                                                 coords)
+            else:
+                # New candidate: compare against the whole trace once
+                row = None
+                for trace_point in self._trace:
+                    row = self._next_row(row, trace_point, coords)
+                self._rows[pos] = row
+
+    def extend(self, points):
+        """
+        Appends each of points to the trace in order.
+        """
+        for point in points:
+            self.append(point)
+
+    @property
+    def candidates(self):
+        """
+        Index of the current candidate streets.
+        """
+        return self._index[sorted(self._rows)]
+
+    def scores(self):
+        """
+        Computes the similarity_score between the trace and each candidate
+        street.
+
+        Returns
+        -------
+        scores : Series
+            similarity_score of each candidate street, indexed by the index
+            of streets. NaN while the trace has no length.
+        """
+        positions = sorted(self._rows)
+        if self._length > 0:
+            # Formula: e^(-frechet_dist/line1.length)
+            values = [round(math.exp((-1)*self._rows[pos][-1]/self._length),
+                            self.precision) for pos in positions]
+        else:
+            values = [np.nan]*len(positions)
+
+        return pd.Series(values, index=self._index[positions],
+                         name='similarity_score', dtype=float)
@@ -0,0 +1,202 @@
+import math
+import geopandas as gpd
+import numpy as np
+
+from matcher import _frechet_row
+from shapely.geometry import LineString, Point
+from shapely.ops import linemerge
+
+def split_line(line, segment_length):
+    """
+    Splits a LineString into consecutive segments of segment_length (the
+    last segment is shorter if the length of line is not a multiple of
+    segment_length).
+
+    All cut points are interpolated in a single pass over the vertices of
+    line instead of one substring per segment.
+
+    Parameters
+    ----------
+    line : LineString
+    segment_length : float
+        Length of each segment, in the units of line
+
+    Returns
+    -------
+    segments : list
+        List of LineStrings
+    starts : ndarray
+        Distance along line at which each segment starts
+    ends : ndarray
+        Distance along line at which each segment ends
+    """
+
+    allowed_types = [
+        'LineString',
+        'LinearRing',
+    ]
+
+    if line is None or line.geom_type not in allowed_types:
+        raise ValueError(
+            "Expected geometry type to be in '{1}' but got '{0}'"
+            .format(None if line is None else line.geom_type, allowed_types)
+        )
+
+    if segment_length <= 0:
+        raise ValueError(
+            "`segment_length` must be positive but was '{}'"
+            .format(segment_length)
+        )
+
+    coords = np.asarray(line.coords)[:, :2]
+
+    # Distance along line of each vertex
+    dist = np.concatenate([[0],
+        np.cumsum(np.hypot(np.diff(coords[:, 0]), np.diff(coords[:, 1])))])
+    total = dist[-1]
+
+    if total == 0:
+        raise ValueError(
+            "Cannot split a LineString with a length of 0"
+        )
+
+    # Distance along line of each cut point, and their coordinates. The
+    # tolerance keeps float rounding from adding a last segment of length
+    # 0 when total is a multiple of segment_length
+    n = max(1, int(np.ceil(total / segment_length - 1e-9)))
+    cuts = np.append(np.arange(n) * segment_length, total)
+    cut_x = np.interp(cuts, dist, coords[:, 0])
+    cut_y = np.interp(cuts, dist, coords[:, 1])
+
+    # Vertices of line strictly between two consecutive cut points
+    lo = np.searchsorted(dist, cuts[:-1], side='right')
+    hi = np.searchsorted(dist, cuts[1:], side='left')
+
+    segments = [
+        LineString([(cut_x[i], cut_y[i])] + [tuple(c) for c in coords[a:b]]
+                   + [(cut_x[i + 1], cut_y[i + 1])])
+        for i, (a, b) in enumerate(zip(lo, hi))
+    ]
+
+    return segments, cuts[:-1], cuts[1:]
+
+def segment_profile(
+            line1,
+            line2,
+            segment_length,
+            method='frechet_dist',
+            precision=6,
+            crs=None
+        ):
+    """
+    Computes the similarity between each segment of line1 and the part of
+    line2 it matches, to show where along line1 it diverges from line2.
+
+    The part of line2 matched by a segment is the part between the
+    projections onto line2 of the start and end of the segment. Each cut
+    point of line1 is projected once and shared by the two segments it
+    separates. The distances between the points of every segment and the
+    vertices and projected cut points of line2 are computed once, and each
+    segment's discrete Frechet distance is computed on the slice of them
+    for the segment and its matched part.
+
+    Parameters
+    ----------
+    line1 : LineString
+    line2 : (Multi)LineString
+        A MultiLineString must be mergeable into a single LineString.
+    segment_length : float
+        Length of each segment of line1, in the units of line1
+    method : string
+        Must be 'frechet_dist' (more methods implemented later)
+        Passed as input to the compare method
+    precision : int
+        The decimal precision at with to round the similarity score
+        Default decimal precision is 6.
+    crs : value accepted by GeoDataFrame or None
+        CRS of the returned GeoDataFrame
+
+    Returns
+    -------
+    res : GeoDataFrame
+        One row per segment of line1, in order, with the columns 'start' and
+        'end' (distance along line1), 'similarity_score' (the same as
+        compare(segment, matched_part, clip=False)) and the segment as
+        geometry
+    """
+    allowed_methods = [
+        'frechet_dist',
+    ]
+
+    if method not in allowed_methods:
+        raise ValueError(
+            "`method` must be in '{0}''".format(allowed_methods)
+        )
+
+    if line2 is not None and line2.geom_type == 'MultiLineString':
+        line2 = linemerge(line2)
+    if line2 is None or line2.geom_type not in ['LineString', 'LinearRing']:
+        raise ValueError(
+            "Expected line2 to be a LineString or a MultiLineString that can \
+            be merged into one, but got '{0}'"
+            .format(None if line2 is None else line2.geom_type)
+        )
+
+    segments, starts, ends = split_line(line1, segment_length)
+
+    # Points of every segment one after the other, segment i being
+    # points1[offsets[i]:offsets[i + 1]]
+    seg_coords = [np.asarray(s.coords)[:, :2] for s in segments]
+    offsets = np.cumsum([0] + [len(c) for c in seg_coords])
+    points1 = np.concatenate(seg_coords)
+
+    # Project every cut point of line1 onto line2 once
+    cuts = points1[np.append(offsets[:-1], offsets[-1] - 1)]
+    projected = np.array([line2.project(Point(p)) for p in cuts])
+
+    coords2 = np.asarray(line2.coords)[:, :2]
+    dist2 = np.concatenate([[0],
+        np.cumsum(np.hypot(np.diff(coords2[:, 0]), np.diff(coords2[:, 1])))])
+    projected_coords = np.column_stack([
+        np.interp(projected, dist2, coords2[:, 0]),
+        np.interp(projected, dist2, coords2[:, 1]),
+    ])
+
+    # Vertices of line2 strictly between the projections of the start and
+    # end of each segment, like substring
+    lo = np.searchsorted(dist2, np.minimum(projected[:-1], projected[1:]),
+                         side='right')
+    hi = np.searchsorted(dist2, np.maximum(projected[:-1], projected[1:]),
+                         side='left')
+
+    # Distances between every point of the segments and every vertex and
+    # projected cut point of line2
+    d_vertices = np.hypot(points1[:, None, 0] - coords2[None, :, 0],
+                          points1[:, None, 1] - coords2[None, :, 1])
+    d_cuts = np.hypot(points1[:, None, 0] - projected_coords[None, :, 0],
+                      points1[:, None, 1] - projected_coords[None, :, 1])
+
+    scores = []
+    for i, segment in enumerate(segments):
+        rows = slice(offsets[i], offsets[i + 1])
+
+        # The matched part of line2, reversed if line1 runs against line2
+        between = d_vertices[rows, lo[i]:hi[i]]
+        if projected[i] > projected[i + 1]:
+            between = between[:, ::-1]
+        block = np.column_stack([d_cuts[rows, i], between,
+                                 d_cuts[rows, i + 1]])
+
+        row = None
+        for c in block:
+            row = _frechet_row(row, c)
+
+        # Formula: e^(-frechet_dist/segment.length), as in compare
+        scores.append(round(math.exp((-1)*row[-1]/segment.length),
+                            precision))
+
+    return gpd.GeoDataFrame({
+        'start': starts,
+        'end': ends,
+        'similarity_score': scores,
+    }, geometry=segments, crs=crs)
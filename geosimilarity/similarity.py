@@ -1,4 +1,5 @@
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 from compare import compare
 from crossjoin import df_crossjoin
@@ -102,47 +103,180 @@ def sindex_similarity(df1, df2, keep_geom='geometry_x', **kwargs):
 
     return gpd.GeoDataFrame(res, geometry=keep_geom)
 
-def similarity(
-            df1,
-            df2,
-            how='sindex',
-            keep_geom='geometry_x',
-            drop_zeroes=False,
-            **kwargs
-        ):
+def _cartesian_candidates(df1, df2):
     """
-    Computes similarity between geometries of two GeoDataFrames.
+    Returns the positions in df1 and df2 of every pair of geometries.
+    """
+    pos1 = np.repeat(np.arange(len(df1)), len(df2))
+    pos2 = np.tile(np.arange(len(df2)), len(df1))
 
-    Currently only supports data GeoDataFrames with (Multi)LineStrings.
+    return pos1, pos2
 
-    Parameters
-    ----------
-    df1 : GeoDataFrame
-    df2 : GeoDataFrame
-    how : string
-        Either 'sindex' or 'cartesian'. Determines whether joining df1 and
-        df2 will be performed by intersecting Spatial Index bounding boxes
-        or by getting the Cartesian product of df1 and df2.
-    keep_geom : string
-        Either 'geometry_x' or 'geometry_y', indicating which geometry column
-        (from df1 and df2 respectively) to use in the returned GeoDataFrame
-    drop_zeroes : bool
-        If True, the rows in the returned GeoDataFrame with a similarity
-        score of 0 will be dropped.
+def _spatial_index(df):
+    """
+    Returns the spatial index of the geometries of df by position.
+    """
+    return gpd.GeoSeries(df.geometry.values).sindex
 
-    Returns
-    -------
-    df : GeoDataFrame
-        GeoDataFrame with the columns of both df1 and df2 with a new columns
-        containing the similarity score, multi-indexed by the original
-        indices of df1 and df2.
+def _sindex_candidates(df1, df2, spatial_index=None):
+    """
+    Returns the positions in df1 and df2 of every pair of geometries whose
+    bounding boxes intersect. spatial_index is the _spatial_index of df2,
+    built if None.
     """
+    if spatial_index is None:
+        spatial_index = _spatial_index(df2)
+
+    pos1 = []
+    pos2 = []
+    for i, geom1 in enumerate(df1.geometry.values):
+        for j in sorted(spatial_index.intersection(geom1.bounds)):
+            pos1.append(i)
+            pos2.append(j)
 
+    return np.array(pos1, dtype=np.int64), np.array(pos2, dtype=np.int64)
+
+def _dwithin_candidates(df1, df2, max_distance, spatial_index=None):
+    """
+    Returns the positions in df1 and df2 of every pair of geometries that
+    are at most max_distance apart. spatial_index is the _spatial_index of
+    df2, built if None.
+    """
+    geoms1 = df1.geometry.values
+    geoms2 = df2.geometry.values
+    if spatial_index is None:
+        spatial_index = _spatial_index(df2)
+
+    # Bulk query of the whole of df1 if the spatial index supports it
+    if 'dwithin' in spatial_index.valid_query_predicates:
+        pos1, pos2 = spatial_index.query(
+            gpd.GeoSeries(geoms1).values, predicate='dwithin',
+            distance=max_distance)
+        order = np.lexsort((pos2, pos1))
+        return pos1[order].astype(np.int64), pos2[order].astype(np.int64)
+
+    # Otherwise expand each bounding box by max_distance and check the
+    # exact distance of the geometries found
+    pos1 = []
+    pos2 = []
+    for i, geom1 in enumerate(geoms1):
+        left, bottom, right, top = geom1.bounds
+        for j in sorted(spatial_index.intersection(
+                (left - max_distance, bottom - max_distance,
+                 right + max_distance, top + max_distance))):
+            if geom1.distance(geoms2[j]) <= max_distance:
+                pos1.append(i)
+                pos2.append(j)
+
+    return np.array(pos1, dtype=np.int64), np.array(pos2, dtype=np.int64)
+
+def _candidates(df1, df2, how, max_distance=None, spatial_index=None):
+    """
+    Returns the positions in df1 and df2 of the pairs of geometries to
+    compare, either by intersecting Spatial Index bounding boxes ('sindex')
+    or by getting the Cartesian product ('cartesian'). If max_distance is
+    given, only the pairs of geometries at most max_distance apart are
+    returned, found with the Spatial Index in both cases. spatial_index is
+    the _spatial_index of df2, built if needed and None.
+    """
     allowed_hows = [
         'cartesian',
         'sindex',
     ]
 
+    if how not in allowed_hows:
+        raise ValueError(
+            "`how` was '{0}' but is expected to be in {1}"
+            .format(how, allowed_hows)
+        )
+
+    if max_distance is not None:
+        if max_distance < 0:
+            raise ValueError(
+                "`max_distance` must not be negative but was '{}'"
+                .format(max_distance)
+            )
+        return _dwithin_candidates(df1, df2, max_distance, spatial_index)
+
+    if how == 'cartesian':
+        return _cartesian_candidates(df1, df2)
+    return _sindex_candidates(df1, df2, spatial_index)
+
+def _score_pairs(df1, df2, pos1, pos2, **kwargs):
+    """
+    Computes the similarity_score of the geometries at positions pos1 of df1
+    and pos2 of df2, without copying any of their columns.
+    """
+    geoms1 = df1.geometry.values
+    geoms2 = df2.geometry.values
+
+    return np.array([compare(geoms1[i], geoms2[j], **kwargs)
+                     for i, j in zip(pos1, pos2)], dtype=float)
+
+def _pairs_frame(df1, df2, pos1, pos2, scores, keep_geom='geometry_x'):
+    """
+    Builds the same GeoDataFrame as sindex_similarity from the positions
+    and similarity_scores of the compared pairs.
+    """
+    left = pd.DataFrame(df1).add_suffix('_x').iloc[pos1]
+    right = pd.DataFrame(df2).add_suffix('_y').iloc[pos2]
+
+    res = pd.concat([right.reset_index(drop=True),
+                     left.reset_index(drop=True)], axis=1)
+    res['similarity_score'] = scores
+    res.index = pd.MultiIndex.from_arrays([left.index, right.index])
+
+    return gpd.GeoDataFrame(res, geometry=keep_geom)
+
+def _cartesian_frame(df1, df2, pos1, pos2, scores, keep_geom='geometry_x'):
+    """
+    Builds the same GeoDataFrame as cartesian_similarity from the positions
+    and similarity_scores of the compared pairs.
+    """
+    left = pd.DataFrame(df1).iloc[pos1]
+    right = pd.DataFrame(df2).iloc[pos2]
+
+    # Like pd.merge in df_crossjoin, only the columns of both df1 and df2
+    # are suffixed
+    common = left.columns.intersection(right.columns)
+    left = left.rename(columns={col: col + '_x' for col in common})
+    right = right.rename(columns={col: col + '_y' for col in common})
+
+    res = pd.concat([left.reset_index(drop=True),
+                     right.reset_index(drop=True)], axis=1)
+    res['similarity_score'] = scores
+    res.index = pd.MultiIndex.from_arrays([left.index, right.index])
+
+    return gpd.GeoDataFrame(res, geometry=keep_geom)
+
+def _check_result(result):
+    """
+    Raises a ValueError if `result` is not a supported result format.
+    """
+    allowed_results = [
+        'frame',
+        'pairs',
+        'sparse',
+    ]
+
+    if result not in allowed_results:
+        raise ValueError(
+            "`result` was '{0}' but is expected to be in {1}"
+            .format(result, allowed_results)
+        )
+
+def _prepare(df1, df2):
+    """
+    Validates df1 and df2 and flattens their MultiLineStrings.
+
+    Returns
+    -------
+    df1, df2 : GeoDataFrame
+        df1 and df2 with only LineStrings
+    orig1, orig2 : ndarray
+        Position in the original df1 and df2 of each row of the flattened
+        df1 and df2
+    """
     # Null/Type check input
     if df1.empty or df2.empty:
         raise ValueError(
@@ -182,14 +316,210 @@ def similarity(
                 "df{} contains mixed geometry types.".format(i + 1)
             )
 
+    orig1 = np.arange(len(df1))
+    orig2 = np.arange(len(df2))
+
     # Flatten MultiLineString GeoDataFrames to only contain LineStrings
     if df1.geom_type.isin(["MultiLineString"]).any():
         df1 = flatten_multilinestring_df(df1)
+        orig1 = df1['index'].to_numpy()
     if df2.geom_type.isin(["MultiLineString"]).any():
         df2 = flatten_multilinestring_df(df2)
+        orig2 = df2['index'].to_numpy()
+
+    return df1, df2, orig1, orig2
+
+def _parts(orig):
+    """
+    Returns the position of each row of a flattened GeoDataFrame among the
+    rows flattened from the same original row, given orig from _prepare.
+    """
+    return pd.Series(orig).groupby(orig).cumcount().to_numpy()
+
+def _format_pairs(
+            result,
+            pos1,
+            pos2,
+            scores,
+            index1,
+            index2,
+            orig1,
+            orig2,
+            drop_zeroes=False,
+        ):
+    """
+    Builds the 'pairs' or 'sparse' result of similarity from the positions
+    (in the flattened df1 and df2) and similarity_scores of the compared
+    pairs.
+    """
+    # Position of each LineString within the MultiLineString it was
+    # flattened from (0 for LineStrings)
+    part1 = _parts(orig1)[pos1]
+    part2 = _parts(orig2)[pos2]
 
+    # Positions in the flattened GeoDataFrames to positions in the
+    # original GeoDataFrames
+    pos1 = orig1[pos1]
+    pos2 = orig2[pos2]
+
+    if drop_zeroes == True:
+        nonzero = scores != 0
+        pos1, pos2, scores = pos1[nonzero], pos2[nonzero], scores[nonzero]
+        part1, part2 = part1[nonzero], part2[nonzero]
+
+    if result == 'pairs':
+        return pd.DataFrame({
+            'idx1': index1[pos1],
+            'idx2': index2[pos2],
+            'part1': part1,
+            'part2': part2,
+            'similarity_score': scores,
+        })
+
+    try:
+        from scipy import sparse
+    except ImportError:
+        raise ImportError(
+            "scipy is required for `result`='sparse'"
+        )
+
+    # Keep the highest similarity_score of the LineStrings of each
+    # MultiLineString
+    best = pd.DataFrame({'pos1': pos1, 'pos2': pos2, 'score': scores}) \
+        .groupby(['pos1', 'pos2'], sort=False)['score'].max()
+    return sparse.csr_matrix(
+        (best.to_numpy(), (best.index.get_level_values('pos1'),
+                           best.index.get_level_values('pos2'))),
+        shape=(len(index1), len(index2)))
+
+def join_attributes(pairs, df1, df2, columns1=None, columns2=None):
+    """
+    Joins selected columns of df1 and df2 onto a result of
+    similarity(..., result='pairs').
+
+    Parameters
+    ----------
+    pairs : DataFrame
+        Result of similarity(df1, df2, result='pairs')
+    df1 : GeoDataFrame
+        The df1 that was passed to similarity
+    df2 : GeoDataFrame
+        The df2 that was passed to similarity
+    columns1 : list or None
+        Columns of df1 to join, suffixed with '_x'. If None, all columns.
+    columns2 : list or None
+        Columns of df2 to join, suffixed with '_y'. If None, all columns.
+
+    Returns
+    -------
+    res : DataFrame
+        pairs with the selected columns of df1 and df2
+    """
+    if columns1 is None:
+        columns1 = list(df1.columns)
+    if columns2 is None:
+        columns2 = list(df2.columns)
+
+    left = pd.DataFrame(df1[columns1]).add_suffix('_x')
+    right = pd.DataFrame(df2[columns2]).add_suffix('_y')
+
+    res = pairs.join(left, on='idx1').join(right, on='idx2')
+
+    return res
+
+def similarity(
+            df1,
+            df2,
+            how='sindex',
+            keep_geom='geometry_x',
+            drop_zeroes=False,
+            result='frame',
+            max_distance=None,
+            **kwargs
+        ):
+    """
+    Computes similarity between geometries of two GeoDataFrames.
+
+    Currently only supports data GeoDataFrames with (Multi)LineStrings.
+
+    Parameters
+    ----------
+    df1 : GeoDataFrame
+    df2 : GeoDataFrame
+    how : string
+        Either 'sindex' or 'cartesian'. Determines whether joining df1 and
+        df2 will be performed by intersecting Spatial Index bounding boxes
+        or by getting the Cartesian product of df1 and df2.
+    keep_geom : string
+        Either 'geometry_x' or 'geometry_y', indicating which geometry column
+        (from df1 and df2 respectively) to use in the returned GeoDataFrame
+    drop_zeroes : bool
+        If True, the rows in the returned GeoDataFrame with a similarity
+        score of 0 will be dropped.
+    result : string
+        Either 'frame', 'pairs' or 'sparse'. 'frame' returns every column of
+        df1 and df2 for each pair. 'pairs' only returns the indices of each
+        pair and their similarity_score (see join_attributes to add columns
+        of df1 and df2 back in). 'sparse' returns a scipy.sparse matrix of
+        similarity_scores (requires scipy).
+    max_distance : float or None
+        If given, only pairs of geometries at most max_distance apart (in
+        the units of the CRS) are compared, instead of every pair whose
+        bounding boxes intersect (or every pair for 'cartesian'). With
+        clip=True, the pairs are clipped to the intersection of their
+        bounding boxes grown by max_distance (see `clip_margin` of
+        compare()), so that parallel geometries are not scored 0.
+
+    Returns
+    -------
+    df : GeoDataFrame, DataFrame or scipy.sparse.csr_matrix
+        If result is 'frame', GeoDataFrame with the columns of both df1 and
+        df2 with a new columns containing the similarity score,
+        multi-indexed by the original indices of df1 and df2.
+        If result is 'pairs', DataFrame with the columns 'idx1', 'idx2'
+        (the original indices of df1 and df2), 'part1', 'part2' and
+        'similarity_score'. Like with 'frame', a MultiLineString has one
+        row per LineString it contains, and 'part1' and 'part2' are the
+        positions of the compared LineStrings within their
+        MultiLineStrings (0 for LineStrings).
+        If result is 'sparse', matrix of shape (len(df1), len(df2)) where
+        entry (i, j) is the similarity_score of the i-th row of df1 and the
+        j-th row of df2. For MultiLineStrings, the highest similarity_score
+        of the LineStrings they contain is kept. Pairs that were not
+        compared are not stored.
+    """
+
+    allowed_hows = [
+        'cartesian',
+        'sindex',
+    ]
+
+    _check_result(result)
+
+    # Pairs within max_distance may not have intersecting bounding boxes,
+    # so the box they are clipped to is grown by max_distance
+    if max_distance is not None:
+        kwargs.setdefault('clip_margin', max_distance)
+
+    # Keep the original indices to report pairs with
+    index1 = df1.index
+    index2 = df2.index
+
+    df1, df2, orig1, orig2 = _prepare(df1, df2)
+
+    if result != 'frame':
+        pos1, pos2 = _candidates(df1, df2, how, max_distance)
+        scores = _score_pairs(df1, df2, pos1, pos2, **kwargs)
+        return _format_pairs(result, pos1, pos2, scores, index1, index2,
+                             orig1, orig2, drop_zeroes)
+
+    # Approach 0: Only compare geometries within max_distance
+    if max_distance is not None:
+        pos1, pos2 = _candidates(df1, df2, how, max_distance)
+        scores = _score_pairs(df1, df2, pos1, pos2, **kwargs)
+        res = _pairs_frame(df1, df2, pos1, pos2, scores, keep_geom)
     # Approach 1: Get Cartesian product
-    if how == 'cartesian':
+    elif how == 'cartesian':
         res =  cartesian_similarity(df1, df2, keep_geom, **kwargs)
     # Approach 2: R-tree spatial index merge
     elif how == 'sindex':
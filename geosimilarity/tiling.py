@@ -0,0 +1,259 @@
+import json
+import math
+import os
+
+import fiona
+import geopandas as gpd
+import pandas as pd
+from cache import file_hash
+from rtree import index as rtree_index
+from shapely.geometry import shape
+from similarity import similarity
+
+MANIFEST_NAME = 'manifest.json'
+
+def _feature_id(feature):
+    """
+    Returns the integer feature id (FID) of a feature yielded by fiona
+    """
+    if isinstance(feature, dict):
+        return int(feature['id'])
+    return int(feature.id)
+
+def _read_fids(filepath, fids):
+    """
+    Reads only the features of filepath with the given feature ids (FIDs).
+
+    Parameters
+    ----------
+    filepath : string
+        Filepath readable by fiona (e.g. *.shp)
+    fids : list
+        FIDs of the features to read
+
+    Returns
+    -------
+    df : GeoDataFrame
+        Features in the order of fids, with their FID in a 'fid' column
+    """
+    with fiona.open(filepath) as src:
+        features = [src[fid] for fid in fids]
+        crs = src.crs
+
+    df = gpd.GeoDataFrame.from_features(features, crs=crs or None)
+    df['fid'] = list(fids)
+    return df
+
+def _owned_fids(filepath, owner):
+    """
+    Streams through filepath and returns a dict of the (i, j) of every tile
+    that owns at least one feature to the FIDs of the features it owns,
+    where owner(x, y) returns the (i, j) of the tile that owns a feature
+    whose bounding box starts at (x, y).
+    """
+    tiles = {}
+    with fiona.open(filepath) as src:
+        for feature in src:
+            if feature['geometry'] is None:
+                continue
+            minx, miny, _, _ = shape(feature['geometry']).bounds
+            tiles.setdefault(owner(minx, miny), []) \
+                .append(_feature_id(feature))
+    return tiles
+
+def _bounds_index(filepath):
+    """
+    Streams through filepath and returns an R-tree spatial index of the
+    bounding box of every feature by FID, without holding the geometries
+    in memory.
+    """
+    sindex = rtree_index.Index()
+    with fiona.open(filepath) as src:
+        for feature in src:
+            if feature['geometry'] is None:
+                continue
+            sindex.insert(_feature_id(feature),
+                          shape(feature['geometry']).bounds)
+    return sindex
+
+def _write_manifest(out_dir, manifest):
+    """
+    Atomically replaces the manifest in out_dir so that a crash never
+    leaves a half-written manifest behind.
+    """
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def _load_manifest(out_dir, params):
+    """
+    Loads the manifest of a previous run in out_dir, or starts a new one.
+    Raises a ValueError if the previous run used different parameters.
+    """
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'params': params, 'tiles': {}}
+
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+
+    if manifest['params'] != params:
+        raise ValueError(
+            "'{0}' was created with parameters '{1}' but received '{2}'. \
+            Use a new `out_dir` to run with different parameters."
+            .format(path, manifest['params'], params)
+        )
+    return manifest
+
+def tiled_similarity(
+            filepath1,
+            filepath2,
+            out_dir,
+            tile_size,
+            **kwargs
+        ):
+    """
+    Computes similarity between the geometries of two files one spatial tile
+    at a time, so that neither file has to fit in memory.
+
+    Features of filepath1 are partitioned into a grid of tile_size squares
+    by the bottom-left corner of their bounding box, so every feature (and
+    therefore every pair) belongs to exactly one tile. A streaming pass over
+    each file records the features owned by every tile and the bounding
+    boxes of the features of filepath2. For each tile, only the features
+    of filepath1 owned by the tile and the features of filepath2 whose
+    bounding box intersects (or is within `max_distance`, if given, of) one
+    of theirs are read, and scored with similarity() using the spatial
+    index. Each tile's result is written to out_dir/tile_<i>_<j>.csv and
+    recorded in out_dir/manifest.json; a rerun with the same out_dir skips
+    the tiles that were already completed.
+
+    Parameters
+    ----------
+    filepath1 : string
+        Filepath of first layer (e.g. *.shp)
+    filepath2 : string
+        Filepath of second layer (e.g. *.shp)
+    out_dir : string
+        Directory to write tile results and the manifest to. Created if it
+        does not exist.
+    tile_size : float
+        Width and height of each tile, in the units of the layers' CRS
+    kwargs : keyword arguments that will be passed to similarity()
+        `how` must be 'sindex' (or not given) and `result` must be 'frame'
+        or 'pairs'.
+
+    Returns
+    -------
+    paths : list
+        Filepaths of the written tile results, including tiles completed
+        by previous runs. Tiles without any pairs are not written.
+    """
+
+    if tile_size <= 0:
+        raise ValueError(
+            "`tile_size` must be positive but was '{}'".format(tile_size)
+        )
+
+    # A Cartesian product cannot be partitioned into tiles
+    if kwargs.get('how', 'sindex') != 'sindex':
+        raise ValueError(
+            "`how` was '{0}' but tiled similarity only supports '{1}'"
+            .format(kwargs['how'], 'sindex')
+        )
+    kwargs['how'] = 'sindex'
+
+    # A sparse matrix cannot be written per tile
+    if kwargs.get('result', 'frame') == 'sparse':
+        raise ValueError(
+            "`result` was 'sparse' but tiled similarity only supports '{}'"
+            .format(['frame', 'pairs'])
+        )
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    # The content of the files is part of the parameters, so that a rerun
+    # on different or modified files does not resume from this out_dir
+    params = dict(kwargs, tile_size=tile_size,
+                  file_hash1=file_hash(filepath1),
+                  file_hash2=file_hash(filepath2))
+    manifest = _load_manifest(out_dir, params)
+    _write_manifest(out_dir, manifest)
+
+    # Tile grid over the extent of filepath1
+    with fiona.open(filepath1) as src:
+        minx, miny, maxx, maxy = src.bounds
+    nx = max(1, math.ceil((maxx - minx) / tile_size))
+    ny = max(1, math.ceil((maxy - miny) / tile_size))
+
+    def owner(x, y):
+        i = min(max(int((x - minx) // tile_size), 0), nx - 1)
+        j = min(max(int((y - miny) // tile_size), 0), ny - 1)
+        return i, j
+
+    tiles = _owned_fids(filepath1, owner)
+    sindex2 = None
+    margin = kwargs.get('max_distance') or 0
+
+    paths = []
+    for i, j in sorted(tiles):
+        key = '{0}_{1}'.format(i, j)
+
+        # Skip tiles completed by a previous run
+        if key in manifest['tiles']:
+            if manifest['tiles'][key]['path']:
+                paths.append(os.path.join(out_dir,
+                                          manifest['tiles'][key]['path']))
+            continue
+
+        # Only built once a tile is left to compute, so that resuming a
+        # completed run does not stream filepath2
+        if sindex2 is None:
+            sindex2 = _bounds_index(filepath2)
+
+        df1 = _read_fids(filepath1, tiles[(i, j)])
+
+        # The candidates of similarity() are the features of filepath2
+        # whose bounding box intersects (or is within max_distance of) the
+        # bounding box of a feature of df1
+        fids2 = set()
+        for left, bottom, right, top in df1.bounds.itertuples(index=False):
+            fids2.update(sindex2.intersection((left - margin,
+                                               bottom - margin,
+                                               right + margin,
+                                               top + margin)))
+
+        tile = {'path': None, 'rows': 0}
+        if len(fids2) > 0:
+            df2 = _read_fids(filepath2, sorted(fids2))
+            res = similarity(df1.reset_index(drop=True),
+                             df2.reset_index(drop=True), **kwargs)
+
+            # Tile-local positions are meaningless outside of the tile,
+            # pairs are identified by the 'fid_x' and 'fid_y' columns
+            if kwargs.get('result', 'frame') == 'pairs':
+                res = pd.DataFrame({
+                    'fid_x': df1['fid'].to_numpy()[res['idx1']],
+                    'fid_y': df2['fid'].to_numpy()[res['idx2']],
+                    'part1': res['part1'],
+                    'part2': res['part2'],
+                    'similarity_score': res['similarity_score'],
+                })
+            else:
+                res = res.reset_index(drop=True)
+
+            if len(res) > 0:
+                tile['path'] = 'tile_{}.csv'.format(key)
+                tile['rows'] = len(res)
+                path = os.path.join(out_dir, tile['path'])
+                res.to_csv(path + '.tmp', index=False)
+                os.replace(path + '.tmp', path)
+                paths.append(path)
+
+        # Checkpoint
+        manifest['tiles'][key] = tile
+        _write_manifest(out_dir, manifest)
+
+    return paths
@@ -0,0 +1,26 @@
+"""
+Fixtures shared by the tests that read layers from files
+"""
+
+import geopandas as gpd
+import pytest
+
+from shapely.geometry import LineString
+
+@pytest.fixture
+def layers(tmp_path):
+    """
+    Writes two small line layers to shapefiles in tmp_path and returns the
+    GeoDataFrames and their filepaths as (df1, df2, filepath1, filepath2).
+    """
+    df1 = gpd.GeoDataFrame({'value': [0, 1, 2]}, \
+        geometry=[LineString([(0,0),(1,1)]), LineString([(5,5),(6,6)]),
+                  LineString([(9,9),(10,10)])])
+    df2 = gpd.GeoDataFrame({'value': [0, 1]}, \
+        geometry=[LineString([(0,0.1),(1,1.1)]), LineString([(5,5),(9,9)])])
+
+    filepath1 = str(tmp_path / 'df1.shp')
+    filepath2 = str(tmp_path / 'df2.shp')
+    df1.to_file(filepath1)
+    df2.to_file(filepath2)
+    return df1, df2, filepath1, filepath2
@@ -0,0 +1,58 @@
+"""
+Testing basic functionality of asimilarity.py
+"""
+
+import asyncio
+import geopandas as gpd
+import pytest
+import geosimilarity
+
+from geosimilarity import asimilarity
+from geosimilarity.asimilarity import asimilarity
+from geosimilarity.similarity import similarity
+from shapely.geometry import LineString, MultiLineString
+
+class TestAsimilarity:
+    df1 = gpd.GeoDataFrame({'value': [0, 1]}, \
+        geometry=[LineString([(0,0),(1,1)]), LineString([(0,0.1),(1,1.1)])])
+    df2 = gpd.GeoDataFrame({'value': [0]}, \
+        geometry=[MultiLineString([[(0,0),(1,1)],[(5,5),(6,6)]])])
+
+    def test_asimilarity_matches_similarity(self):
+        res = asyncio.run(asimilarity(self.df1, self.df2, batch_size=1))
+        expected = similarity(self.df1, self.df2)
+        assert list(res.similarity_score) == \
+            list(expected.similarity_score.astype(float))
+        assert list(res.index) == list(expected.index)
+
+    def test_asimilarity_cartesian_columns(self):
+        res = asyncio.run(asimilarity(self.df1, self.df2, how='cartesian'))
+        expected = similarity(self.df1, self.df2, how='cartesian')
+        assert list(res.columns) == list(expected.columns)
+        assert list(res.index) == list(expected.index)
+
+    def test_asimilarity_candidate_progress(self):
+        calls = []
+        asyncio.run(asimilarity(self.df1, self.df2, result='pairs',
+                                batch_size=1,
+                                candidate_progress=lambda done, total:
+                                    calls.append((done, total))))
+        assert calls == [(1, 2), (2, 2)]
+
+    def test_asimilarity_progress(self):
+        calls = []
+        asyncio.run(asimilarity(self.df1, self.df2, how='cartesian',
+                                result='pairs', batch_size=3,
+                                progress=lambda done, total:
+                                    calls.append((done, total))))
+        assert calls == [(0, 4), (3, 4), (4, 4)]
+
+    def test_asimilarity_cancel(self):
+        async def run():
+            task = asyncio.ensure_future(asimilarity(
+                self.df1, self.df2, how='cartesian', batch_size=1,
+                progress=lambda done, total: done == 1 and task.cancel()))
+            await task
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(run())
@@ -0,0 +1,50 @@
+"""
+Testing basic functionality of cache.py
+"""
+
+import os
+import sys
+import pytest
+import geosimilarity
+
+from geosimilarity import cache
+from geosimilarity.cache import cache_key, check_pyarrow, load_result, \
+    save_result, evict
+from geosimilarity.similarity import similarity
+
+class TestCache:
+    def test_cache_key(self, layers):
+        df1, df2, filepath1, filepath2 = layers
+        key = cache_key(filepath1, filepath2, precision=6)
+        assert key == cache_key(filepath1, filepath2, precision=6)
+        assert key != cache_key(filepath1, filepath2, precision=5)
+        assert key != cache_key(filepath2, filepath1, precision=6)
+
+    def test_check_pyarrow(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'pyarrow', None)
+        with pytest.raises(ImportError):
+            check_pyarrow()
+
+    def test_save_load_result(self, layers, tmp_path):
+        pytest.importorskip('pyarrow')
+        df1, df2, filepath1, filepath2 = layers
+        result = similarity(df1, df2)
+        save_result(str(tmp_path), 'key', result)
+        loaded = load_result(str(tmp_path), 'key', keep_geom='geometry_y')
+        assert loaded.geometry.name == 'geometry_y'
+        assert list(loaded.similarity_score) == \
+            list(result.similarity_score.astype(float))
+        assert load_result(str(tmp_path), 'other') is None
+
+    def test_evict(self, tmp_path):
+        names = ['0' * 64 + '.parquet', '1' * 64 + '.parquet', 'data.parquet']
+        for i, name in enumerate(names):
+            path = tmp_path / name
+            path.write_bytes(b'0' * 10)
+            os.utime(path, (i, i))
+        os.utime(tmp_path / 'data.parquet', (0, 0))
+        evict(str(tmp_path), 15)
+        assert not (tmp_path / names[0]).exists()
+        assert (tmp_path / names[1]).exists()
+        # Files not written by the cache are never evicted
+        assert (tmp_path / 'data.parquet').exists()
@@ -0,0 +1,59 @@
+"""
+Testing basic functionality of compact.py
+"""
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import geosimilarity
+
+from geosimilarity import compact
+from geosimilarity.compact import CompactLines, clip_coords, \
+    compare_coords, compact_similarity
+from geosimilarity.compare import compare
+from geosimilarity.linestring_tools import line_to_coords
+from geosimilarity.similarity import similarity
+from shapely.geometry import LineString, MultiLineString, box
+
+class TestCompact:
+    df1 = gpd.GeoDataFrame({'value': [0, 1]}, \
+        geometry=[LineString([(0,0),(1,1),(2,1)]),
+                  LineString([(5,5),(6,6)])])
+    df2 = gpd.GeoDataFrame({'value': [0, 1]}, \
+        geometry=[MultiLineString([[(0,0.1),(1,1.1)],[(1,1.1),(2,1)]]),
+                  LineString([(0,1),(2,0)])])
+
+    def test_clip_coords(self):
+        line = LineString([(0,0),(3,0),(3,3),(0,3),(0,1)])
+        clipped, length = clip_coords(np.array(line.coords), 1, -1, 2, 4)
+        expected = line.intersection(box(1, -1, 2, 4))
+        assert clipped.tolist() == line_to_coords(expected)
+        assert length == expected.length
+
+    def test_compare_coords(self):
+        line1 = LineString([(0,0),(1,1),(2,1)])
+        line2 = LineString([(0,0.1),(1,1.1),(3,1)])
+        assert compare_coords(np.array(line1.coords),
+                              np.array(line2.coords)) \
+            == compare(line1, line2)
+
+    def test_compact_lines_max_error(self):
+        for dtype in ['int32', 'float32']:
+            lines = CompactLines(self.df2, dtype=dtype)
+            assert len(lines) == 3
+            assert lines.max_error < 1e-6
+            assert np.allclose(lines.line_coords(2), [(0,1),(2,0)])
+
+    def test_compact_lines_overflow(self):
+        with pytest.raises(ValueError):
+            CompactLines(self.df1, resolution=1e-12)
+
+    def test_compact_similarity(self):
+        expected = similarity(self.df1, self.df2, result='pairs')
+        res = compact_similarity(CompactLines(self.df1),
+                                 CompactLines(self.df2))
+        assert list(res.idx1) == list(expected.idx1)
+        assert list(res.idx2) == list(expected.idx2)
+        assert list(res.part2) == list(expected.part2)
+        assert np.allclose(res.similarity_score, expected.similarity_score,
+                           atol=1e-6)
@@ -46,3 +46,10 @@ class TestCompare:
         line2 = LineString([(0,0), (2,2)])
         similarity = compare(line1, line2, clip_max=0.2)
         assert similarity == 1
+
+    def test_compare_clip_margin(self):
+        line1 = LineString([(0,0), (10,0)])
+        line2 = LineString([(0,0.5), (10,0.5)])
+        assert compare(line1, line2) == 0
+        assert compare(line1, line2, clip_margin=1) == \
+            compare(line1, line2, clip=False)
@@ -0,0 +1,40 @@
+"""
+Testing basic functionality of matcher.py
+"""
+
+import geopandas as gpd
+import geosimilarity
+
+from geosimilarity import matcher
+from geosimilarity.matcher import FrechetMatcher
+from geosimilarity.compare import compare
+from shapely.geometry import LineString, MultiLineString
+
+class TestFrechetMatcher:
+    streets = gpd.GeoDataFrame({'name': ['a', 'b', 'c']}, \
+        geometry=[LineString([(0,0),(1,0),(2,0),(3,0)]),
+                  MultiLineString([[(0,0.5),(1,0.5)],[(1,0.5),(2,0.6)]]),
+                  LineString([(10,10),(11,11)])])
+
+    def test_matcher_matches_compare(self):
+        trace = [(0,0.1), (0.7,0.2), (1.4,0.1), (2.2,0.3), (2.9,0.1)]
+        matcher = FrechetMatcher(self.streets, radius=1)
+        for i, point in enumerate(trace):
+            matcher.append(point)
+            if i == 0:
+                continue
+            scores = matcher.scores()
+            assert len(scores) == 2
+            for idx, score in scores.items():
+                assert score == compare(LineString(trace[:i+1]), \
+                    self.streets.geometry[idx], clip=False)
+
+    def test_matcher_candidates(self):
+        matcher = FrechetMatcher(self.streets, radius=0.5)
+        matcher.extend([(0,0), (1,0)])
+        assert list(matcher.candidates) == [0, 1]
+        matcher.extend([(5,5), (10.5,10.5)])
+        assert list(matcher.candidates) == [2]
+        assert matcher.scores()[2] == compare(
+            LineString([(0,0), (1,0), (5,5), (10.5,10.5)]),
+            self.streets.geometry[2], clip=False)
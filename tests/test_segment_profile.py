@@ -0,0 +1,63 @@
+"""
+Testing basic functionality of segment_profile.py
+"""
+
+import pytest
+import geosimilarity
+
+from geosimilarity import segment_profile
+from geosimilarity.segment_profile import segment_profile, split_line
+from geosimilarity.compare import compare
+from shapely.geometry import LineString
+
+class TestSegmentProfile:
+    line1 = LineString([(0,0), (2,0), (2,2), (5,2)])
+    line2 = LineString([(0,0.1), (2,0.1), (2,2)])
+
+    def test_split_line(self):
+        segments, starts, ends = split_line(self.line1, 2)
+        assert [list(s.coords) for s in segments] == \
+            [[(0,0), (2,0)], [(2,0), (2,2)], [(2,2), (4,2)], [(4,2), (5,2)]]
+        assert list(starts) == [0, 2, 4, 6]
+        assert list(ends) == [2, 4, 6, 7]
+
+    def test_split_line_between_vertices(self):
+        segments, starts, ends = split_line(self.line1, 3)
+        assert [list(s.coords) for s in segments] == \
+            [[(0,0), (2,0), (2,1)], [(2,1), (2,2), (4,2)], [(4,2), (5,2)]]
+
+    def test_split_line_multiple_of_length(self):
+        segments, starts, ends = split_line(LineString([(0,0),(0.3,0)]), 0.1)
+        assert len(segments) == 3
+        assert all(s.length > 0 for s in segments)
+        assert ends[-1] == 0.3
+
+    def test_segment_profile(self):
+        profile = segment_profile(self.line1, self.line2, 2)
+        assert list(profile.similarity_score) == [
+            compare(LineString([(0,0), (2,0)]),
+                    LineString([(0,0.1), (2,0.1)]), clip=False),
+            compare(LineString([(2,0), (2,2)]),
+                    LineString([(2,0.1), (2,2)]), clip=False),
+            compare(LineString([(2,2), (4,2)]),
+                    LineString([(2,2), (2,2)]), clip=False),
+            compare(LineString([(4,2), (5,2)]),
+                    LineString([(2,2), (2,2)]), clip=False),
+        ]
+        assert profile.similarity_score.iloc[0] > \
+            profile.similarity_score.iloc[-1]
+
+    def test_segment_profile_invalid_length(self):
+        with pytest.raises(ValueError):
+            segment_profile(self.line1, self.line2, 0)
+
+    def test_segment_profile_invalid_method(self):
+        with pytest.raises(ValueError):
+            segment_profile(self.line1, self.line2, 2, method='hausdorff')
+
+    def test_segment_profile_reversed(self):
+        reversed_line2 = LineString(list(self.line2.coords)[::-1])
+        profile = segment_profile(self.line1, self.line2, 2)
+        reversed_profile = segment_profile(self.line1, reversed_line2, 2)
+        assert list(profile.similarity_score) == \
+            list(reversed_profile.similarity_score)
@@ -6,7 +6,7 @@ import geopandas as gpd
 import geosimilarity
 
 from geosimilarity import similarity
-from geosimilarity.similarity import similarity
+from geosimilarity.similarity import similarity, join_attributes
 from shapely.geometry import LineString, MultiLineString
 
 class TestSimilarity:
@@ -31,3 +31,53 @@ class TestSimilarity:
             geometry=[MultiLineString([[(0,0),(1,1)],[(5,5),(6,6)]])])
         similarity_gdf = similarity(df1,df2,how='cartesian')
         assert len(similarity_gdf) == 2
+
+    def test_similarity_pairs(self):
+        df1 = gpd.GeoDataFrame([0], geometry=[LineString([(0,0),(1,1)])])
+        pairs = similarity(df1, self.df2, how='cartesian', result='pairs')
+        assert list(pairs.columns) == \
+            ['idx1', 'idx2', 'part1', 'part2', 'similarity_score']
+        assert len(pairs) == 2
+        assert list(pairs.part2) == [0, 1]
+        assert pairs.similarity_score.max() == 1
+
+    def test_similarity_sparse(self):
+        df1 = gpd.GeoDataFrame([0], geometry=[LineString([(0,0),(1,1)])])
+        matrix = similarity(df1, self.df2, how='cartesian', result='sparse')
+        assert matrix.shape == (1, 1)
+        assert matrix[0, 0] == 1
+
+    def test_join_attributes(self):
+        df1 = gpd.GeoDataFrame({'name': ['a']}, \
+            geometry=[LineString([(0,0),(1,1)])])
+        pairs = similarity(df1, self.df2, result='pairs')
+        res = join_attributes(pairs, df1, self.df2, columns1=['name'],
+                              columns2=[])
+        assert list(res.columns) == \
+            ['idx1', 'idx2', 'part1', 'part2', 'similarity_score', 'name_x']
+        assert list(res.name_x) == ['a']
+
+    def test_similarity_max_distance(self):
+        df1 = gpd.GeoDataFrame({'value': [0]}, \
+            geometry=[LineString([(0,0),(10,10)])])
+        df2 = gpd.GeoDataFrame({'value': [0, 1, 2]}, \
+            geometry=[LineString([(0,10),(1,9)]),
+                      LineString([(0,-0.5),(10,9.5)]),
+                      LineString([(11,10.5),(12,11.5)])])
+        assert len(similarity(df1, df2)) == 2
+        similarity_gdf = similarity(df1, df2, max_distance=1.5)
+        assert list(similarity_gdf.index) == [(0, 1), (0, 2)]
+        pairs = similarity(df1, df2, how='cartesian', result='pairs',
+                           max_distance=1)
+        assert list(pairs.idx2) == [1]
+
+    def test_similarity_max_distance_parallel(self):
+        df1 = gpd.GeoDataFrame({'value': [0]}, \
+            geometry=[LineString([(0,0),(10,0)])])
+        df2 = gpd.GeoDataFrame({'value': [0]}, \
+            geometry=[LineString([(0,0.5),(10,0.5)])])
+        pairs = similarity(df1, df2, result='pairs', max_distance=1)
+        assert list(pairs.similarity_score) == \
+            list(similarity(df1, df2, how='cartesian', result='pairs',
+                            clip=False).similarity_score)
+        assert pairs.similarity_score[0] > 0
@@ -0,0 +1,65 @@
+"""
+Testing basic functionality of tiling.py
+"""
+
+import json
+import os
+import pandas as pd
+import pytest
+import geosimilarity
+
+from geosimilarity import tiling
+from geosimilarity.tiling import tiled_similarity
+from geosimilarity.similarity import similarity
+
+class TestTiling:
+    def test_tiled_similarity_matches_similarity(self, layers, tmp_path):
+        df1, df2, filepath1, filepath2 = layers
+        paths = tiled_similarity(filepath1, filepath2,
+                                 str(tmp_path / 'out'), tile_size=3)
+        res = pd.concat([pd.read_csv(p) for p in paths])
+        expected = similarity(df1, df2)
+        assert sorted(res.similarity_score) == \
+            sorted(expected.similarity_score.astype(float))
+
+    def test_tiled_similarity_resume(self, layers, tmp_path):
+        df1, df2, filepath1, filepath2 = layers
+        out_dir = str(tmp_path / 'out')
+        paths = tiled_similarity(filepath1, filepath2, out_dir, tile_size=3)
+        mtimes = [os.path.getmtime(p) for p in paths]
+        assert tiled_similarity(filepath1, filepath2, out_dir, tile_size=3) \
+            == paths
+        assert [os.path.getmtime(p) for p in paths] == mtimes
+
+    def test_tiled_similarity_modified_file(self, layers, tmp_path):
+        df1, df2, filepath1, filepath2 = layers
+        out_dir = str(tmp_path / 'out')
+        tiled_similarity(filepath1, filepath2, out_dir, tile_size=3)
+        df2.iloc[:1].to_file(filepath2)
+        with pytest.raises(ValueError):
+            tiled_similarity(filepath1, filepath2, out_dir, tile_size=3)
+
+    def test_tiled_similarity_owned_tiles(self, layers, tmp_path):
+        df1, df2, filepath1, filepath2 = layers
+        out_dir = str(tmp_path / 'out')
+        tiled_similarity(filepath1, filepath2, out_dir, tile_size=3)
+        with open(os.path.join(out_dir, tiling.MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        # Only the 3 of the 16 tiles that own a feature of df1 are visited
+        assert sorted(manifest['tiles']) == ['0_0', '1_1', '3_3']
+
+    def test_tiled_similarity_reads(self, layers, tmp_path, monkeypatch):
+        df1, df2, filepath1, filepath2 = layers
+        reads = []
+        read_fids = tiling._read_fids
+        def record(filepath, fids):
+            reads.append((os.path.basename(filepath), list(fids)))
+            return read_fids(filepath, fids)
+        monkeypatch.setattr(tiling, '_read_fids', record)
+        tiled_similarity(filepath1, filepath2, str(tmp_path / 'out'),
+                         tile_size=3)
+        # Each tile reads the feature of df1 it owns and only the features
+        # of df2 whose bounding box intersects it
+        assert reads == [('df1.shp', [0]), ('df2.shp', [0]),
+                         ('df1.shp', [1]), ('df2.shp', [1]),
+                         ('df1.shp', [2]), ('df2.shp', [1])]